@@ -5,77 +5,109 @@ Can read from a text file or from direct text input.
 """
 
 import argparse
+import binascii
+import re
+import struct
 import sys
 import os
 
+UTF8_BOM = b'\xef\xbb\xbf'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+IEND_CHUNK = b'IEND'
+# Complete IEND chunk: zero length, type, and its (constant) CRC
+IEND_TRAILER = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+# Every byte value that is not a hex digit, for use with bytes.translate(None, NON_HEX_BYTES)
+NON_HEX_BYTES = bytes(b for b in range(256) if b not in HEX_DIGITS)
+# Start of an xxd-style dump: optional blank lines, then "offset:", capturing the rest of the first line
+XXD_OFFSET = re.compile(rb'\s*[0-9a-fA-F]+:[ \t]?([^\r\n]*)')
+# xxd line: "offset: hexdata  ascii" - captures the single-space separated hex groups,
+# stopping at the 2+ consecutive spaces before the ASCII part
+XXD_LINE = re.compile(rb'^[ \t]*[0-9a-fA-F]+:[ \t]?([0-9a-fA-F]*(?:[ \t][0-9a-fA-F]+)*)', re.M)
+# PNG chunk header: 4 bytes big-endian data length + 4 bytes chunk type
+CHUNK_HEADER = struct.Struct('>I4s')
+
 def find_png_data(binary_data: bytes) -> bytes:
     """
     Find and extract valid PNG data from binary bytes, even if padded.
     PNG files start with signature: 89 50 4E 47 0D 0A 1A 0A
     """
-    PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
-    IEND_CHUNK = b'IEND'
-    
-    # Try to find PNG signature
-    png_start = binary_data.find(PNG_SIGNATURE)
+    # Check if entire file is PNG (starts with signature), otherwise search for the signature
+    png_start = 0 if binary_data.startswith(PNG_SIGNATURE) else binary_data.find(PNG_SIGNATURE)
     
     if png_start == -1:
-        # Check if entire file is PNG (starts with signature)
-        if binary_data[:8] == PNG_SIGNATURE:
-            png_start = 0
-        else:
-            raise ValueError("PNG signature not found in hexdump data. Expected signature: 89504e470d0a1a0a")
+        raise ValueError("PNG signature not found in hexdump data. Expected signature: 89504e470d0a1a0a")
     
-    # Extract from PNG signature onwards
-    png_data = binary_data[png_start:]
+    # Walk the chunks (header + data + 4 bytes CRC) from the signature until IEND
+    pos = png_start + len(PNG_SIGNATURE)
+    while pos + CHUNK_HEADER.size <= len(binary_data):
+        length, chunk_type = CHUNK_HEADER.unpack_from(binary_data, pos)
+        pos += CHUNK_HEADER.size + length + 4
+        if chunk_type == IEND_CHUNK:
+            if pos <= len(binary_data):
+                return binary_data[png_start:pos]
+            break
     
-    # Validate PNG structure by checking for IEND chunk
-    iend_pos = png_data.rfind(IEND_CHUNK)
+    # Chunk structure is truncated or corrupted: fall back to searching for the IEND chunk
+    # (offsets index binary_data directly so the buffer is only copied once, on return).
+    # Unpadded data ends exactly with the IEND chunk, which is where the search would stop
+    if binary_data.endswith(IEND_TRAILER):
+        return binary_data[png_start:]
+    iend_pos = binary_data.rfind(IEND_CHUNK, png_start)
     if iend_pos == -1:
         raise ValueError("PNG IEND chunk not found. The hexdump may be incomplete or corrupted.")
     
     # PNG IEND chunk is: 4 bytes length (0x00000000), 4 bytes type (IEND), 4 bytes CRC
-    # So we need 12 bytes after IEND
-    iend_end = iend_pos + 12
-    if len(png_data) < iend_end:
+    # So we need 8 bytes from the start of the IEND type
+    iend_end = iend_pos + 8
+    if len(binary_data) < iend_end:
         # If we don't have enough data, try to use what we have but warn
         print("Warning: PNG may be incomplete. IEND chunk appears truncated.")
-        return png_data
+        return binary_data[png_start:]
     
     # Return complete PNG (from signature to end of IEND chunk)
-    return png_data[:iend_end]
+    return binary_data[png_start:iend_end]
 
 
-def parse_hexdump(hexdump_data: str) -> bytes:
+def parse_hexdump(hexdump_data: bytes) -> bytes:
     """
-    Parse a hexdump string (xxd-style or raw hex) into binary bytes.
+    Parse ASCII hexdump bytes (xxd-style or raw hex) into binary bytes.
     """
-    hex_str = ''
-    for line in hexdump_data.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if ':' in line:  # xxd-style (offset + hex)
-            try:
-                _, hex_part = line.split(':', 1)
-                # More robust parsing: remove ASCII part if present
-                # xxd format: "offset: hexdata  ascii"
-                # Try splitting by multiple spaces to separate hex from ASCII
-                hex_part = hex_part.strip()
-                # Remove ASCII part (anything after 2+ consecutive spaces or at position 48+)
-                if '  ' in hex_part:
-                    hex_part = hex_part.split('  ')[0]
-                elif len(hex_part) > 48:
-                    # xxd typically has 48 chars of hex, rest is ASCII
-                    hex_part = hex_part[:48]
-                hex_str += hex_part.replace(' ', '')
-            except ValueError:
-                continue
+    # Text editors may save the dump with a byte order mark in front of the first line
+    if hexdump_data.startswith(UTF8_BOM):
+        hexdump_data = hexdump_data[len(UTF8_BOM):]
+    
+    binary_data = None
+    
+    # The first non-empty line decides the format for the whole input
+    first_line = XXD_OFFSET.match(hexdump_data)
+    if first_line:
+        # xxd-style (offset + hex + optional ASCII column): keep only the captured hex columns.
+        # The hex column has a fixed width (xxd and PNG2HexDump pad short rows), so capture
+        # as many hex/space characters per line as the first line's hex column holds.
+        hex_width = first_line.group(1).find(b'  ')
+        if hex_width < 0:
+            # No ASCII column (PNG2HexDump --no-ascii): the whole first line is hex
+            hex_width = len(first_line.group(1).rstrip())
+        if hex_width > 0:
+            xxd_line = re.compile(rb'^[ \t]*[0-9a-fA-F]+:[ \t]?([0-9a-fA-F \t]{0,%d})' % hex_width, re.M)
+            hex_columns = b'\n'.join(xxd_line.findall(hexdump_data))
+            if b'  ' in hex_columns.rstrip():
+                # A 2+ space gap before the end means a short row was not padded to the full
+                # width and its ASCII part was captured: use the pattern that stops at the gap
+                hex_columns = b''.join(XXD_LINE.findall(hexdump_data))
         else:
-            # plain hex string line - remove any non-hex characters
-            # Keep only 0-9, a-f, A-F
-            cleaned = ''.join(c for c in line if c in '0123456789abcdefABCDEF')
-            hex_str += cleaned
+            hex_columns = b''.join(XXD_LINE.findall(hexdump_data))
+        hex_str = hex_columns.translate(None, NON_HEX_BYTES)
+    else:
+        # plain hex string - unbroken hex (as written by PNG2HexDump) decodes as-is without
+        # the filtering pass; otherwise remove any non-hex characters
+        hex_str = hexdump_data.strip()
+        try:
+            binary_data = binascii.unhexlify(hex_str)
+        except binascii.Error:
+            hex_str = hexdump_data.translate(None, NON_HEX_BYTES)
     
     if not hex_str:
         raise ValueError("No hex characters found in input")
@@ -85,7 +117,8 @@ def parse_hexdump(hexdump_data: str) -> bytes:
         raise ValueError(f"Hex string length is odd ({len(hex_str)} characters). Each byte requires 2 hex digits.")
     
     try:
-        binary_data = bytes.fromhex(hex_str)
+        if binary_data is None:
+            binary_data = binascii.unhexlify(hex_str)
         # Try to find and extract valid PNG data
         return find_png_data(binary_data)
     except ValueError as e:
@@ -102,13 +135,14 @@ def hexdump_to_png(hexdump_input: str, output_file: str, from_file: bool):
     """
     try:
         if from_file:
-            if not os.path.exists(hexdump_input):
+            try:
+                with open(hexdump_input, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
                 print(f"Error: Input file not found: {hexdump_input}")
                 sys.exit(1)
-            with open(hexdump_input, 'r', encoding='utf-8') as f:
-                data = f.read()
         else:
-            data = hexdump_input
+            data = hexdump_input.encode('utf-8')
 
         if not data or not data.strip():
             print("Error: No hexdump data found.")
@@ -122,7 +156,7 @@ def hexdump_to_png(hexdump_input: str, output_file: str, from_file: bool):
 
         # Ensure output directory exists
         output_dir = os.path.dirname(output_file)
-        if output_dir and not os.path.exists(output_dir):
+        if output_dir:
             os.makedirs(output_dir, exist_ok=True)
 
         with open(output_file, 'wb') as f:
@@ -132,7 +166,7 @@ def hexdump_to_png(hexdump_input: str, output_file: str, from_file: bool):
         file_size = len(img_bytes)
         
         # Validate PNG signature
-        if img_bytes[:8] != b'\x89PNG\r\n\x1a\n':
+        if not img_bytes.startswith(PNG_SIGNATURE):
             print("Warning: Output file does not have a valid PNG signature.")
         
         print(f"PNG successfully written to: {abs_output_path}")
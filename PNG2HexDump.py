@@ -5,33 +5,86 @@ Optionally choose plain or xxd-style formatted output.
 """
 
 import argparse
+import contextlib
+import functools
+import mmap
+import os
+import sys
 import textwrap
 
-def file_to_hexdump(input_file, output_file=None, style="plain"):
-    with open(input_file, 'rb') as f:
-        data = f.read()
-
-    if style == "plain":
-        # Simple continuous hex string
-        hex_str = data.hex()
-    elif style == "xxd":
-        # xxd-style formatted dump (offset + spaced bytes)
-        hex_str = ""
-        for offset in range(0, len(data), 16):
-            chunk = data[offset:offset + 16]
-            hex_part = " ".join(f"{b:02x}" for b in chunk)
-            ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-            hex_str += f"{offset:08x}: {hex_part:<48}  {ascii_part}\n"
-    else:
+# Window size over the input data; a multiple of 16 so xxd rows never straddle two windows
+CHUNK_SIZE = 65536
+
+# Maps printable ASCII bytes to themselves and everything else to '.'
+ASCII_TABLE = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
+# xxd row: offset, hex bytes padded to 48 columns, ASCII column. Output is written in
+# binary mode, so rows end with the platform newline a text-mode write would produce
+XXD_ROW = ("{:08x}: {:<48}  {}" + os.linesep).format
+# xxd row without the ASCII column: offset, hex bytes
+XXD_ROW_NO_ASCII = ("{:08x}: {}" + os.linesep).format
+
+@contextlib.contextmanager
+def input_windows(f):
+    """
+    Yield an iterator over CHUNK_SIZE windows of an open binary file.
+    The file is memory-mapped when possible; files that cannot be mapped
+    (empty files, pipes) are read CHUNK_SIZE bytes at a time instead.
+    """
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        mm = None
+    if mm is None:
+        # A buffered read(n) only returns fewer than n bytes at EOF, so windows stay row-aligned
+        yield iter(functools.partial(f.read, CHUNK_SIZE), b'')
+        return
+    with mm:
+        yield (mm[offset:offset + CHUNK_SIZE] for offset in range(0, len(mm), CHUNK_SIZE))
+
+
+def iter_hexdump(windows, style="plain", show_ascii=True):
+    """
+    Yield the hexdump of consecutive input windows (see input_windows) as
+    ASCII-encoded blocks, one block per window.
+    """
+    offset = 0
+    for chunk in windows:
+        if style == "plain":
+            # Simple continuous hex string
+            yield chunk.hex().encode('ascii')
+        else:
+            # xxd-style formatted dump (offset + spaced bytes)
+            rows = []
+            if show_ascii:
+                for i in range(0, len(chunk), 16):
+                    row = chunk[i:i + 16]
+                    rows.append(XXD_ROW(offset + i, row.hex(' '), row.translate(ASCII_TABLE).decode('ascii')))
+            else:
+                for i in range(0, len(chunk), 16):
+                    rows.append(XXD_ROW_NO_ASCII(offset + i, chunk[i:i + 16].hex(' ')))
+            yield ''.join(rows).encode('ascii')
+        offset += len(chunk)
+
+
+def file_to_hexdump(input_file, output_file=None, style="plain", show_ascii=True):
+    if style not in ("plain", "xxd"):
         raise ValueError("Invalid style. Use 'plain' or 'xxd'.")
 
-    # Write or print
-    if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(hex_str)
-        print(f"Hexdump written to: {output_file}")
-    else:
-        print(hex_str)
+    with open(input_file, 'rb') as f, input_windows(f) as windows:
+        # Write or print
+        if output_file:
+            with open(output_file, 'wb') as out:
+                for block in iter_hexdump(windows, style, show_ascii):
+                    out.write(block)
+            print(f"Hexdump written to: {output_file}")
+        else:
+            # Blocks are already ASCII-encoded, so bypass the text layer
+            out = sys.stdout.buffer
+            for block in iter_hexdump(windows, style, show_ascii):
+                out.write(block)
+            # Trailing newline as print() would write it
+            out.write(os.linesep.encode('ascii'))
+            out.flush()
 
 
 def main():
@@ -42,9 +95,14 @@ def main():
     parser.add_argument("-o", "--output", help="Output text file (optional)")
     parser.add_argument("-s", "--style", choices=["plain", "xxd"], default="plain",
                         help="Output style: 'plain' (default) or 'xxd'")
+    parser.add_argument("--no-ascii", action="store_true",
+                        help="Omit the ASCII column from 'xxd' style output")
     args = parser.parse_args()
 
-    file_to_hexdump(args.input, args.output, args.style)
+    if args.no_ascii and args.style != "xxd":
+        parser.error("--no-ascii requires --style xxd")
+
+    file_to_hexdump(args.input, args.output, args.style, not args.no_ascii)
 
 
 if __name__ == "__main__":